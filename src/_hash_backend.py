@@ -0,0 +1,269 @@
+"""File hashing backend used by FileMonitor.
+
+All file hashing goes through this module so the choice of implementation
+lives in one place. BLAKE3 (from the optional ``blake3`` package) is the
+default when installed: it hashes with SIMD and multiple threads and is
+several times faster than SHA-256. SHA-256 remains available for setups whose
+policy requires it, and is the fallback without ``blake3``.
+
+hashlib delegates SHA-256 to the OpenSSL libcrypto that
+CPython was linked against; OpenSSL >= 1.1.0 dispatches at runtime to the
+Intel SHA extensions (SHA-NI) or the ARMv8 SHA2 instructions when the CPU has
+them. If HW_SHA256 is False on a CPU that reports the flags, rebuild Python
+with ``--with-openssl=`` pointing at a current OpenSSL 3.x build.
+"""
+import errno
+import hashlib
+import mmap
+import os
+import ssl
+import sys
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+ALGORITHMS = ("blake3", "sha256")
+DEFAULT_ALGORITHM = "blake3" if blake3 is not None else "sha256"
+# Read size for files hashed without a mapping (1 MiB)
+BLOCK_SIZE = 1 << 20
+
+# BLAKE3 only spreads a file over its thread pool from this size up; below
+# it the hand-off costs more than it saves
+BLAKE3_THREADS_THRESHOLD = 1 << 20
+
+# Files at least this large are read with O_DIRECT where supported
+DIRECT_IO_THRESHOLD = 16 << 20
+
+# Files below this size skip the posix_fadvise hints; for a file that arrives
+# in one read the two extra syscalls cost more than the read itself
+SMALL_FILE_THRESHOLD = 64 * 1024
+
+# Plain reads never need the descriptor in child processes
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+# Keeps scans from dirtying inodes with atime updates (Linux only)
+_O_NOATIME = getattr(os, "O_NOATIME", 0)
+
+# Files opened and handed to kernel readahead at once by hash_files
+PREFETCH_BATCH = 64
+
+# Only files from SMALL_FILE_THRESHOLD up to this size are prefetched. Larger
+# ones get sequential readahead while they are read (or bypass the cache with
+# O_DIRECT), so prefetching them would read them twice and flood the cache
+PREFETCH_MAX_SIZE = 256 * 1024
+
+
+def _cpu_flags() -> set:
+    """Return the CPU feature flags of a core this process may run on."""
+    if not sys.platform.startswith("linux"):
+        return set()
+
+    try:
+        allowed = os.sched_getaffinity(0)
+    except (AttributeError, OSError):
+        allowed = None
+
+    flags = set()
+    processor = None
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                key = key.strip()
+                if key == "processor":
+                    processor = int(value)
+                elif key in ("flags", "Features"):
+                    if allowed is None or processor is None or processor in allowed:
+                        flags.update(value.split())
+                        break
+    except (OSError, ValueError):
+        pass
+    return flags
+
+
+def _openssl_version() -> tuple:
+    return ssl.OPENSSL_VERSION_INFO[:3]
+
+
+CPU_HAS_SHA = bool(_cpu_flags() & {"sha_ni", "sha2"})
+
+# OpenSSL picks the SHA-NI / ARMv8 kernels on its own from 1.1.0 onwards
+HW_SHA256 = (
+    CPU_HAS_SHA
+    and "sha256" in hashlib.algorithms_available
+    and _openssl_version() >= (1, 1, 0)
+)
+
+
+def describe(algorithm: str = DEFAULT_ALGORITHM) -> str:
+    """Human readable summary of the active hashing backend."""
+    if algorithm == "blake3":
+        return f"blake3 {blake3.__version__} (SIMD, multi-threaded)"
+    accel = "hardware accelerated" if HW_SHA256 else "software"
+    return f"sha256 via {ssl.OPENSSL_VERSION} ({accel})"
+
+
+def new_hasher(algorithm: str, size: int = 0):
+    """Return a fresh hash object for algorithm, sized for a size-byte input."""
+    if algorithm == "blake3":
+        if blake3 is None:
+            raise ValueError("blake3 is not installed (pip install blake3)")
+        if size >= BLAKE3_THREADS_THRESHOLD:
+            return blake3.blake3(max_threads=blake3.blake3.AUTO)
+        return blake3.blake3()
+    if algorithm == "sha256":
+        return hashlib.sha256()
+    raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+
+
+def _open(path, extra_flags: int = 0) -> int:
+    """Open path for reading, without touching its atime where allowed.
+
+    Only the file's owner (or root) may pass O_NOATIME; anyone else gets
+    PermissionError and the file is opened normally.
+    """
+    flags = _OPEN_FLAGS | extra_flags
+    if _O_NOATIME:
+        try:
+            return os.open(path, flags | _O_NOATIME)
+        except PermissionError:
+            pass
+    return os.open(path, flags)
+
+
+def _advise(fd: int, name: str):
+    """posix_fadvise the whole file, where the platform supports it."""
+    advice = getattr(os, name, None)
+    if advice is None:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        pass
+
+
+def _hash_direct(path, algorithm: str, size: int):
+    """Hash with O_DIRECT, bypassing the page cache.
+
+    Returns None when the platform or filesystem does not support direct I/O
+    (e.g. tmpfs), so the caller can fall back to buffered reads.
+    """
+    o_direct = getattr(os, "O_DIRECT", 0)
+    if not o_direct:
+        return None
+
+    try:
+        fd = _open(path, o_direct)
+    except OSError as e:
+        if e.errno == errno.EINVAL:
+            return None
+        raise
+
+    try:
+        hasher = new_hasher(algorithm, size)
+        # Anonymous mappings are page aligned, as O_DIRECT requires
+        with mmap.mmap(-1, BLOCK_SIZE) as buf, memoryview(buf) as view:
+            while True:
+                n = os.readv(fd, [buf])
+                if not n:
+                    break
+                hasher.update(view[:n])
+        return hasher.digest()
+    except OSError as e:
+        if e.errno == errno.EINVAL:
+            return None
+        raise
+    finally:
+        os.close(fd)
+
+
+def _read_into(fd: int, hasher):
+    """Feed everything left in fd to hasher; empty sizes (e.g. procfs) too."""
+    while True:
+        chunk = os.read(fd, BLOCK_SIZE)
+        if not chunk:
+            break
+        hasher.update(chunk)
+
+
+def _hash_fd(fd: int, path, algorithm: str, size: int = None) -> bytes:
+    if size is None:
+        size = os.fstat(fd).st_size
+
+    if size >= DIRECT_IO_THRESHOLD:
+        digest = _hash_direct(path, algorithm, size)
+        if digest is not None:
+            return digest
+
+    hasher = new_hasher(algorithm, size)
+    if size < SMALL_FILE_THRESHOLD:
+        _read_into(fd, hasher)
+        return hasher.digest()
+
+    # Larger files: raw 1 MiB reads with no buffering layer. Files are not
+    # mapped: a file truncated while mapped raises SIGBUS and kills the
+    # process, and files under a FIM get truncated (log rotation, editors).
+    # FIM reads each file once: ask for aggressive readahead, then drop the
+    # pages instead of evicting data other programs are using
+    _advise(fd, "POSIX_FADV_SEQUENTIAL")
+    try:
+        _read_into(fd, hasher)
+        return hasher.digest()
+    finally:
+        _advise(fd, "POSIX_FADV_DONTNEED")
+
+
+def hash_file(path, algorithm: str = DEFAULT_ALGORITHM) -> bytes:
+    """Return the raw digest of the file at path."""
+    fd = _open(path)
+    try:
+        return _hash_fd(fd, path, algorithm)
+    finally:
+        os.close(fd)
+
+
+def hash_files(paths, algorithm: str = DEFAULT_ALGORITHM):
+    """Yield (path, raw digest or exception) for each path, in order.
+
+    Files are opened PREFETCH_BATCH at a time and the kernel is asked to read
+    the mid-sized ones ahead (POSIX_FADV_WILLNEED) before the first is hashed,
+    so their disk reads overlap instead of being issued one file at a time.
+    """
+    paths = list(paths)
+
+    for start in range(0, len(paths), PREFETCH_BATCH):
+        window = []
+        try:
+            for path in paths[start:start + PREFETCH_BATCH]:
+                try:
+                    fd = _open(path)
+                except OSError as e:
+                    window.append((path, e, 0))
+                    continue
+                try:
+                    size = os.fstat(fd).st_size
+                except OSError as e:
+                    os.close(fd)
+                    window.append((path, e, 0))
+                    continue
+                if SMALL_FILE_THRESHOLD <= size < PREFETCH_MAX_SIZE:
+                    _advise(fd, "POSIX_FADV_WILLNEED")
+                window.append((path, fd, size))
+
+            for i, (path, fd, size) in enumerate(window):
+                if isinstance(fd, Exception):
+                    yield path, fd
+                    continue
+                try:
+                    digest = _hash_fd(fd, path, algorithm, size)
+                except Exception as e:
+                    digest = e
+                finally:
+                    os.close(fd)
+                    window[i] = (path, None, size)
+                yield path, digest
+        finally:
+            for _, fd, _ in window:
+                if isinstance(fd, int):
+                    os.close(fd)
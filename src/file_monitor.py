@@ -1,21 +1,173 @@
 from pathlib import Path
-import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import os
+import stat
+import struct
+import threading
 import time
 from datetime import datetime
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+import functools
+import hashlib
+import itertools
 import logging
+import logging.handlers
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+from src._hash_backend import DEFAULT_ALGORITHM, describe, hash_file, hash_files, new_hasher
+from src.watcher import FULL_CHECK, EventSource
 
 # Files to ignore during monitoring
 IGNORE_FILES = [".baseline.txt", ".DS_Store", "Thumbs.db", ".key.key", "monitor.log"]
 
+# Files modified this close to a scan are rehashed on the next poll, since a
+# later write may land within the same mtime tick (2 s covers FAT)
+RACY_WINDOW_NS = 2_000_000_000
+
+# AES-256-GCM key and nonce sizes for the encrypted baseline
+KEY_BYTES = 32
+NONCE_BYTES = 12
+
+# Binary baseline layout: header, then per file
+#   u16 path length | path bytes | i64 size | i64 mtime_ns | u64 inode | 32-byte digest
+# A size of -1 means no stat signature; an all-zero digest means hashing failed.
+# The header is the magic, u8 version and the algorithm as u8 length | ASCII name.
+BASELINE_MAGIC = b"FIMB"
+BASELINE_VERSION = 3
+_HEADER = struct.Struct("<BB")
+_RECORD_HEAD = struct.Struct("<H")
+_RECORD_TAIL = struct.Struct("<qqQ32s")
+_NO_DIGEST = bytes(32)
+
+# Baselines are zstd-compressed before encryption when zstandard is installed;
+# level 1 shrinks the path table at a fraction of the cost of AES-GCM
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ZSTD_LEVEL = 1
+
+# Hash in a thread pool only when there are enough files to pay for it.
+# hashlib and blake3 release the GIL while hashing, so threads overlap both
+# the disk waits and the hashing itself
+PARALLEL_THRESHOLD = 32
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Files handed to a pool worker per task
+WORKER_BATCH = 16
+
+
+def _configure_forensic_log(directory: Path) -> logging.Logger:
+    """Return the forensic logger writing to directory/monitor.log.
+
+    Each monitored directory gets its own logger and handler, installed
+    once; logging.basicConfig only ever honoured the first directory.
+    """
+    log = logging.getLogger(f"fim.{directory}")
+    if not log.handlers:
+        # WatchedFileHandler reopens the file if it is rotated or deleted
+        handler = logging.handlers.WatchedFileHandler(directory / "monitor.log")
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+    return log
+
+
+def _write_file(path, data: bytes):
+    """Replace the contents of path with data in a single write call."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        _write_all(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _write_all(fd: int, data: bytes):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _read_file(path) -> bytes:
+    """Return the contents of path, read with as few calls as possible."""
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(size, 1 << 16))
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+def _create_key(path) -> bytes:
+    """Create the key file with a fresh AES-GCM key and return the key.
+
+    O_EXCL makes creation atomic: if another monitor or process got there
+    first, its key is returned instead, so both encrypt with the same key.
+    """
+    key = AESGCM.generate_key(bit_length=KEY_BYTES * 8)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    try:
+        fd = os.open(path, flags, 0o600)
+    except FileExistsError:
+        return _read_file(path)
+    try:
+        _write_all(fd, key)
+    finally:
+        os.close(fd)
+    return key
+
+
+def _locked(method):
+    """Run method under the monitor's lock: a Watcher thread and the GUI may
+    drive the same monitor at once, and both change its dicts in place."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _hash_batch(paths: list, algorithm: str) -> list:
+    """Hash a batch of files in a pool worker; errors are returned, not raised."""
+    return list(hash_files(paths, algorithm))
+
 
 class FileMonitor:
     """Monitors a directory or a single file for creation, deletion, and modification."""
 
-    def __init__(self, path: str, baseline_file: str = None, logger=print):
+    def __init__(self, path: str, baseline_file: str = None, logger=print,
+                 paranoid: bool = False, algorithm: str = None):
         self.path = Path(path).resolve()
         self.logger = logger
+        self.paranoid = paranoid
+        self.algorithm = algorithm or DEFAULT_ALGORITHM
+        self._lock = threading.RLock()
+        new_hasher(self.algorithm)  # fail early on an unusable algorithm
+        # Algorithm of the digests in the loaded baseline
+        self._baseline_algorithm = None
         self.file_hashes = {}
+        # (size, mtime_ns, inode) of each file when it was last hashed
+        self.file_stats = {}
+
+        # The baseline is only re-encrypted and rewritten when it changed
+        self._baseline_dirty = False
+        self._last_plaintext_sha = None
+
+        # Set by start_watch(); check_changes() then only visits changed paths,
+        # once one full walk has caught up with changes made before the watch
+        self._event_source = None
+        self._watch_synced = False
+        # Hashing threads, started on the first large scan and kept for later
+        # ones; shut down by close()
+        self._pool = None
 
         # Detect if path is a file or directory
         if self.path.is_file():
@@ -25,6 +177,15 @@ class FileMonitor:
             self.directory = self.path
             self.single_file = False
 
+        # The walk works on plain strings: entry paths below the directory
+        # start with the prefix, and slicing it off is much cheaper than
+        # building Path objects for relative_to
+        self._dir_str = os.fspath(self.directory)
+        self._dir_prefix = os.path.join(self._dir_str, "")
+        self._dir_prefix_len = len(self._dir_prefix)
+        self._file_name = self.path.name
+        self._file_str = os.fspath(self.path)
+
         # Baseline file location
         if baseline_file:
             self.baseline_file = Path(baseline_file).resolve()
@@ -34,137 +195,513 @@ class FileMonitor:
         # Encryption Key Handling
         self.key_file = self.directory / ".key.key"
 
-        if not self.key_file.exists():
-            key = Fernet.generate_key()
-            with open(self.key_file, "wb") as kf:
-                kf.write(key)
-        else:
-            with open(self.key_file, "rb") as kf:
-                key = kf.read()
+        self._legacy_cipher = None
+        # Set while a legacy key is being replaced: the new key is only
+        # written once a baseline encrypted with it is on disk, so the Fernet
+        # key survives a failed migration
+        self._unsaved_key = None
 
-        self.cipher = Fernet(key)
+        try:
+            key = _read_file(self.key_file)
+        except FileNotFoundError:
+            key = _create_key(self.key_file)
+
+        # Fernet key from an older release: decrypt the baseline with it
+        # once, then re-encrypt under a fresh AES-GCM key
+        if len(key) != KEY_BYTES:
+            self._legacy_cipher = Fernet(key)
+            key = AESGCM.generate_key(bit_length=KEY_BYTES * 8)
+            self._unsaved_key = key
+
+        self.cipher = AESGCM(key)
 
         # Logging setup (forensic log)
-        logging.basicConfig(
-            filename=self.directory / "monitor.log",
-            level=logging.INFO,
-            format="%(asctime)s - %(message)s"
-        )
+        self.forensic_log = _configure_forensic_log(self.directory)
 
         self.load_baseline()
 
-    def calculate_hash(self, filepath: Path) -> str:
-        sha256 = hashlib.sha256()
+        # Stay with the baseline's algorithm unless another one is asked for
+        if algorithm is None and self._baseline_algorithm is not None:
+            self.algorithm = self._baseline_algorithm
+            new_hasher(self.algorithm)
+        self.forensic_log.info(f"Monitoring {self.path} with {describe(self.algorithm)}")
+
+        if self._legacy_cipher:
+            self._legacy_cipher = None
+            self.save_baseline()
+
+        if self.single_file:
+            self.scan = self._scan_single
+            self.check_changes = self._check_single
+
+        if self._baseline_algorithm not in (None, self.algorithm):
+            self._migrate_baseline()
+
+    @property
+    @_locked
+    def file_hashes_hex(self) -> dict:
+        """file_hashes with hex digests, for display and export."""
+        return {path: digest.hex() for path, digest in self.file_hashes.items()}
+
+    def calculate_hash(self, filepath: str) -> bytes:
+        # Path objects are accepted but converted once, not in every call below
+        filepath = os.fspath(filepath)
         try:
-            with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    sha256.update(chunk)
-            return sha256.hexdigest()
+            return hash_file(filepath, self.algorithm)
         except Exception as e:
-            self.logger(f"[ERROR] Hashing failed for {filepath}: {e}")
-            logging.error(f"Hashing failed for {filepath}: {e}")
-            return ""
+            self._hash_failed(filepath, e)
+            return b""
+
+    def _hash_failed(self, filepath, error):
+        self.logger(f"[ERROR] Hashing failed for {filepath}: {error}")
+        self.forensic_log.error(f"Hashing failed for {filepath}: {error}")
+
+    def _iter_hashes(self, files):
+        """Yield (relative path, hash) for (relative path, DirEntry) pairs,
+        spreading the work over all cores for large sets."""
+        paths = [entry.path for _, entry in files]
+
+        if len(paths) < PARALLEL_THRESHOLD:
+            yield from self._collect_hashes(files, hash_files(paths, self.algorithm))
+            return
+
+        # Each worker gets a run of files so its reads overlap through the
+        # readahead window in hash_files
+        batches = [paths[i:i + WORKER_BATCH] for i in range(0, len(paths), WORKER_BATCH)]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fim-hash")
+        results = self._pool.map(_hash_batch, batches, itertools.repeat(self.algorithm))
+        yield from self._collect_hashes(files, itertools.chain.from_iterable(results))
+
+    def _collect_hashes(self, files, results):
+        for (rel, _), (path, digest) in zip(files, results):
+            if isinstance(digest, Exception):
+                self._hash_failed(path, digest)
+                digest = b""
+            yield rel, digest
 
     # Encrypted baseline loading
     def load_baseline(self):
-        if self.baseline_file.exists():
-            try:
-                with open(self.baseline_file, "rb") as f:
-                    encrypted_data = f.read()
-
-                decrypted_data = self.cipher.decrypt(encrypted_data).decode()
-
-                for line in decrypted_data.splitlines():
-                    path, filehash = line.strip().split("|", 1)
-                    self.file_hashes[path] = filehash
-
-            except Exception as e:
-                self.logger(f"[ERROR] Loading baseline failed: {e}")
-                logging.error(f"Loading baseline failed: {e}")
+        try:
+            # One read of the whole file; a missing baseline is not an error
+            encrypted_data = _read_file(self.baseline_file)
+
+            if self._legacy_cipher:
+                plaintext = self._legacy_cipher.decrypt(encrypted_data)
+            else:
+                nonce = encrypted_data[:NONCE_BYTES]
+                plaintext = self.cipher.decrypt(nonce, encrypted_data[NONCE_BYTES:], None)
+            if plaintext.startswith(ZSTD_MAGIC):
+                if zstandard is None:
+                    raise ValueError("baseline is zstd-compressed; install zstandard")
+                plaintext = zstandard.ZstdDecompressor().decompress(plaintext)
+            if plaintext.startswith(BASELINE_MAGIC):
+                self._unpack_baseline(plaintext)
+            else:
+                # Text baselines written by older releases
+                self._parse_text_baseline(plaintext.decode())
+                self._baseline_dirty = True
+
+            if self._legacy_cipher:
+                self._baseline_dirty = True
+            elif not self._baseline_dirty:
+                self._last_plaintext_sha = hashlib.sha256(plaintext).digest()
+
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger(f"[ERROR] Loading baseline failed: {e!r}")
+            self.forensic_log.error(f"Loading baseline failed: {e!r}")
 
     # Encrypted baseline saving
+    @_locked
     def save_baseline(self):
+        if not self._baseline_dirty:
+            return
+
         try:
-            data = "\n".join(
-                f"{path}|{filehash}"
-                for path, filehash in self.file_hashes.items()
-            )
+            data = self._pack_baseline()
+
+            plaintext_sha = hashlib.sha256(data).digest()
+            if (plaintext_sha != self._last_plaintext_sha or self._unsaved_key is not None
+                    or not self.baseline_file.exists()):
+                if zstandard is not None:
+                    data = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+                nonce = os.urandom(NONCE_BYTES)
+                encrypted_data = self.cipher.encrypt(nonce, data, None)
 
-            encrypted_data = self.cipher.encrypt(data.encode())
+                _write_file(self.baseline_file, nonce + encrypted_data)
+                if self._unsaved_key is not None:
+                    _write_file(self.key_file, self._unsaved_key)
+                    self._unsaved_key = None
 
-            with open(self.baseline_file, "wb") as f:
-                f.write(encrypted_data)
+                self._last_plaintext_sha = plaintext_sha
+
+            self._baseline_dirty = False
 
         except Exception as e:
             self.logger(f"[ERROR] Saving baseline failed: {e}")
-            logging.error(f"Saving baseline failed: {e}")
+            self.forensic_log.error(f"Saving baseline failed: {e}")
+
+    def _pack_baseline(self) -> bytes:
+        # While a migration is pending the stored digests are still the old
+        # algorithm's, and must be labelled as such
+        algorithm = (self._baseline_algorithm or self.algorithm).encode("ascii")
+        parts = [BASELINE_MAGIC, _HEADER.pack(BASELINE_VERSION, len(algorithm)), algorithm]
+        append = parts.append
+        pack_head = _RECORD_HEAD.pack
+        pack_tail = _RECORD_TAIL.pack
+        file_stats = self.file_stats
+
+        for path, filehash in self.file_hashes.items():
+            path_bytes = os.fsencode(path)
+            size, mtime_ns, ino = file_stats.get(path) or (-1, -1, 0)
+            digest = filehash or _NO_DIGEST
+
+            append(pack_head(len(path_bytes)))
+            append(path_bytes)
+            append(pack_tail(size, mtime_ns, ino, digest))
+
+        # One join instead of a buffer write per field
+        return b"".join(parts)
+
+    def _unpack_baseline(self, buf: bytes):
+        view = memoryview(buf)
+        offset = len(BASELINE_MAGIC)
+
+        version, name_len = _HEADER.unpack_from(view, offset)
+        if version != BASELINE_VERSION:
+            raise ValueError(f"unsupported baseline version {version}")
+        offset += _HEADER.size
+        self._baseline_algorithm = view[offset:offset + name_len].tobytes().decode("ascii")
+        offset += name_len
+
+        while offset < len(view):
+            (path_len,) = _RECORD_HEAD.unpack_from(view, offset)
+            offset += _RECORD_HEAD.size
+            path = os.fsdecode(view[offset:offset + path_len].tobytes())
+            offset += path_len
+            size, mtime_ns, ino, digest = _RECORD_TAIL.unpack_from(view, offset)
+            offset += _RECORD_TAIL.size
+
+            self.file_stats[path] = (size, mtime_ns, ino) if size >= 0 else None
+            self.file_hashes[path] = digest if digest != _NO_DIGEST else b""
+
+    def _parse_text_baseline(self, data: str):
+        self._baseline_algorithm = "sha256"
+        # path|hex digest lines; text baselines have no stats, so every file
+        # is rehashed once
+        records = [line.rsplit("|", 1) for line in data.splitlines() if "|" in line]
+        for path, filehash in records:
+            self.file_hashes[path] = bytes.fromhex(filehash)
+
+    def _migrate_baseline(self):
+        """Re-create a baseline that was hashed with another algorithm.
+
+        Changes since the old baseline are reported first, by checking with
+        the old algorithm, so switching algorithms cannot hide tampering.
+
+        Raises ValueError, leaving the old baseline untouched, when the old
+        algorithm is unavailable: re-baselining unverified files would accept
+        whatever tampering happened since.
+        """
+        old_algorithm = self._baseline_algorithm
+        new_algorithm = self.algorithm
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    def _get_files(self):
-        if self.single_file:
-            return [self.path]
+        try:
+            new_hasher(old_algorithm)
+        except ValueError as e:
+            reason = (f"Refusing to migrate baseline from {old_algorithm} to "
+                      f"{new_algorithm}, it cannot be verified first: {e}")
+            self.logger(f"[{ts}] [ERROR] {reason}")
+            self.forensic_log.error(f"[{ts}] [ERROR] {reason}")
+            raise ValueError(reason) from e
+
+        message = f"[{ts}] [INFO] Migrating baseline from {old_algorithm} to {new_algorithm}"
+        self.logger(message)
+        self.forensic_log.info(message)
 
-        return [
-            f for f in self.directory.rglob("*")
-            if f.is_file() and f.name not in IGNORE_FILES
-        ]
+        self.algorithm = old_algorithm
+        self.check_changes()
+        self.algorithm = new_algorithm
 
+        self._baseline_dirty = True
+        self._baseline_algorithm = new_algorithm
+        self.scan()
+
+    def _stat_signature(self, entry: os.DirEntry, now_ns: int):
+        """(size, mtime_ns, inode) of a file, or None if it must be rehashed next time."""
+        try:
+            st = entry.stat(follow_symlinks=False)
+            # DirEntry.stat() leaves st_ino at 0 on Windows; inode() has it
+            ino = entry.inode()
+        except OSError:
+            return None
+        return self._signature(st, now_ns, ino)
+
+    @staticmethod
+    def _signature(st: os.stat_result, now_ns: int, ino: int = None):
+        if now_ns - st.st_mtime_ns < RACY_WINDOW_NS:
+            return None
+        return (st.st_size, st.st_mtime_ns, st.st_ino if ino is None else ino)
+
+    def _iter_files(self):
+        """Yield (relative path, os.DirEntry) for every file in the directory.
+
+        Names and file types come from the directory listing itself; the
+        entry's stat() is only called later and is cached on the entry, so
+        each file costs at most one stat per walk.
+        """
+        prefix_len = self._dir_prefix_len
+        ignore = frozenset(IGNORE_FILES)
+        stack = [self._dir_str]
+        while stack:
+            d = stack.pop()
+            try:
+                it = os.scandir(d)
+            except OSError as e:
+                self.logger(f"[ERROR] Listing failed for {d}: {e}")
+                self.forensic_log.error(f"Listing failed for {d}: {e}")
+                continue
+
+            with it:
+                for e in it:
+                    if e.name in ignore:
+                        continue
+                    # Files outnumber directories, so test for them first
+                    if e.is_file(follow_symlinks=False):
+                        yield e.path[prefix_len:], e
+                    elif e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+
+    @_locked
     def scan(self):
         """Create or update baseline with all current files."""
-        files = self._get_files()
+        now_ns = time.time_ns()
+        files = list(self._iter_files())
 
-        self.file_hashes = {
-            str(f.relative_to(self.directory)): self.calculate_hash(f)
-            for f in files
+        # Stat before hashing so a write during the hash moves the mtime
+        file_stats = {
+            rel: self._stat_signature(entry, now_ns) for rel, entry in files
         }
+        file_hashes = dict(self._iter_hashes(files))
+
+        self._store_scan(file_hashes, file_stats)
 
+    def _store_scan(self, file_hashes: dict, file_stats: dict):
         baseline_exists = self.baseline_file.exists()
+        if (not baseline_exists or file_hashes != self.file_hashes
+                or file_stats != self.file_stats):
+            self.file_hashes = file_hashes
+            self.file_stats = file_stats
+            self._baseline_dirty = True
         self.save_baseline()
 
         ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         if baseline_exists:
-            message = f"[{ts}] [INFO] Baseline updated for {len(files)} file(s)"
+            message = f"[{ts}] [INFO] Baseline updated for {len(file_hashes)} file(s)"
         else:
-            message = f"[{ts}] [INFO] Baseline created for {len(files)} file(s)"
+            message = f"[{ts}] [INFO] Baseline created for {len(file_hashes)} file(s)"
 
         self.logger(message)
-        logging.info(message)
+        self.forensic_log.info(message)
 
         save_msg = f"[{ts}] [INFO] Baseline saved at: {self.baseline_file}"
         self.logger(save_msg)
-        logging.info(save_msg)
+        self.forensic_log.info(save_msg)
+
+    def start_watch(self) -> bool:
+        """Follow filesystem events so check_changes() only re-checks the
+        paths they name instead of walking the whole tree.
+
+        Returns False when event watching is unavailable (no watchdog, or
+        the observer could not start); check_changes() keeps walking then.
+        The first check_changes() after this still walks the tree, to catch
+        anything that changed before the watch began.
+        """
+        if self._event_source is None:
+            source = EventSource(self)
+            if not source.start():
+                return False
+            self._event_source = source
+            self._watch_synced = False
+        return True
+
+    def stop_watch(self):
+        if self._event_source is not None:
+            self._event_source.stop()
+            self._event_source = None
+
+    @_locked
+    def close(self):
+        """Stop watching, stop the hashing threads and release the forensic
+        log file, so the directory can be removed straight away (Windows
+        keeps open files locked).
+
+        The log file is reopened if the monitor logs again.
+        """
+        self.stop_watch()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for handler in self.forensic_log.handlers:
+            handler.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @_locked
+    def check_changes(self, full_rescan: bool = False):
+        """Check for created, deleted, or modified files.
+
+        While start_watch() is active only the paths reported since the last
+        call are re-checked, unless full_rescan is set or a directory was
+        moved or deleted.
+        """
+        if self._event_source is not None:
+            # A walk below covers everything queued so far
+            paths = self._event_source.drain()
+            if not full_rescan and self._watch_synced and FULL_CHECK not in paths:
+                self.rehash(paths)
+                return
+            self._watch_synced = True
+
+        now_ns = time.time_ns()
+        current = {}
+        current_stats = {}
+        to_hash = []
+
+        # Only rehash files whose size, mtime or inode moved since the last hash
+        for rel, entry in self._iter_files():
+            signature = self._stat_signature(entry, now_ns)
+            current_stats[rel] = signature
+
+            if (not self.paranoid and signature is not None
+                    and signature == self.file_stats.get(rel)
+                    and self.file_hashes.get(rel)):
+                current[rel] = self.file_hashes[rel]
+            else:
+                to_hash.append((rel, entry))
+
+        rehashed = dict(self._iter_hashes(to_hash))
+        current.update(rehashed)
+
+        old = self.file_hashes
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    def check_changes(self):
-        """Check for created, deleted, or modified files."""
+        # Created
+        for f in current.keys() - old.keys():
+            self._report(ts, "CREATED", f)
 
-        current = {
-            str(f.relative_to(self.directory)): self.calculate_hash(f)
-            for f in self._get_files()
-        }
+        # Deleted
+        for f in old.keys() - current.keys():
+            self._report(ts, "DELETED", f)
 
-        old = set(self.file_hashes)
-        new = set(current)
+        # Modified; files whose stat matched reused their old hash, so only
+        # the rehashed ones can differ
+        for f, filehash in rehashed.items():
+            if f in old and old[f] != filehash:
+                self._report(ts, "MODIFIED", f)
+
+        # Refreshed stat signatures are persisted too, so the next run can
+        # keep skipping unchanged files
+        if current_stats != self.file_stats:
+            self._baseline_dirty = True
+
+        self.file_hashes = current
+        self.file_stats = current_stats
+        self.save_baseline()
 
+    @_locked
+    def rehash(self, paths):
+        """Re-check only the given absolute paths, e.g. from filesystem events."""
+        now_ns = time.time_ns()
         ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ignore = frozenset(IGNORE_FILES)
 
-        # Created
-        for f in new - old:
-            message = f"[{ts}] [CREATED] {f}"
-            self.logger(message)
-            logging.info(message)
+        for path in paths:
+            if not path.startswith(self._dir_prefix):
+                continue
+            rel = path[self._dir_prefix_len:]
+            if self.single_file:
+                if rel != self._file_name:
+                    continue
+            elif os.path.basename(rel) in ignore:
+                continue
 
-        # Deleted
-        for f in old - new:
-            message = f"[{ts}] [DELETED] {f}"
-            self.logger(message)
-            logging.info(message)
-
-        # Modified
-        for f in old & new:
-            if self.file_hashes[f] != current[f]:
-                message = f"[{ts}] [MODIFIED] {f}"
-                self.logger(message)
-                logging.info(message)
+            self._recheck_file(path, rel, now_ns, ts, reuse_unchanged=False)
 
-        self.file_hashes = current
-        self.save_baseline()
\ No newline at end of file
+        self.save_baseline()
+
+    def _recheck_file(self, path: str, rel: str, now_ns: int, ts: str,
+                      reuse_unchanged: bool):
+        try:
+            st = os.stat(path, follow_symlinks=False)
+            is_file = stat.S_ISREG(st.st_mode)
+        except OSError:
+            is_file = False
+
+        if not is_file:
+            if rel in self.file_hashes:
+                del self.file_hashes[rel]
+                self.file_stats.pop(rel, None)
+                self._report(ts, "DELETED", rel)
+            return
+
+        signature = self._signature(st, now_ns)
+        old_hash = self.file_hashes.get(rel)
+
+        if (reuse_unchanged and old_hash and signature is not None
+                and signature == self.file_stats.get(rel)):
+            return
+
+        filehash = self.calculate_hash(path)
+
+        if old_hash is None:
+            self._report(ts, "CREATED", rel)
+        elif old_hash != filehash:
+            self._report(ts, "MODIFIED", rel)
+        elif signature != self.file_stats.get(rel):
+            self._baseline_dirty = True
+
+        self.file_hashes[rel] = filehash
+        self.file_stats[rel] = signature
+
+    # Single-file monitoring: no directory walk, dict rebuilding or set
+    # algebra, just one stat (and a hash when it changed)
+    @_locked
+    def _scan_single(self):
+        now_ns = time.time_ns()
+        try:
+            st = os.stat(self._file_str, follow_symlinks=False)
+        except OSError:
+            file_hashes, file_stats = {}, {}
+        else:
+            signature = self._signature(st, now_ns)
+            file_hashes = {self._file_name: self.calculate_hash(self._file_str)}
+            file_stats = {self._file_name: signature}
+
+        self._store_scan(file_hashes, file_stats)
+
+    @_locked
+    def _check_single(self, full_rescan: bool = False):
+        # The file is always re-checked, so queued events (which also cover
+        # its siblings) are only drained to keep the queue bounded
+        if self._event_source is not None:
+            self._event_source.drain()
+        now_ns = time.time_ns()
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._recheck_file(self._file_str, self._file_name, now_ns, ts,
+                           reuse_unchanged=not self.paranoid)
+        self.save_baseline()
+
+    def _report(self, ts: str, kind: str, rel: str):
+        message = f"[{ts}] [{kind}] {rel}"
+        self.logger(message)
+        self.forensic_log.info(message)
+        self._baseline_dirty = True
@@ -1,17 +1,28 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import threading
-import time
 from datetime import datetime
+from pathlib import Path
 from src.file_monitor import FileMonitor
+from src.watcher import Watcher
+
+# Milliseconds between moves of queued log messages into the text widget
+LOG_DRAIN_INTERVAL = 100
 
 class FileMonitorGUI:
-    def __init__(self, root):
+    def __init__(self, root, paranoid=False, algorithm=None):
         self.root = root
         self.root.title("File Integrity Monitor")
 
+        # Settings for every monitor this window opens, as given on the command line
+        self.paranoid = paranoid
+        self.algorithm = algorithm
+
         self.monitor = None
-        self.watching = False
+        self.watcher = None
+        # Re-selecting a path reuses its monitor instead of reloading the
+        # key and decrypting the baseline again
+        self._monitor_cache = {}
 
         tk.Label(root, text="File Integrity Monitor", font=("Arial", 16)).pack(pady=10)
 
@@ -25,40 +36,71 @@ class FileMonitorGUI:
         self.text_area.pack(pady=10)
         self.text_area.config(state='disabled')
 
+        self.text_area.tag_config("green", foreground="green")
+        self.text_area.tag_config("red", foreground="red")
+        self.text_area.tag_config("orange", foreground="orange")
+        self.text_area.tag_config("black", foreground="black")
+
+        # Messages from any thread wait here and the Tk thread moves them into
+        # the widget. log() never calls Tk itself: from the Watcher thread that
+        # call blocks until the Tk loop runs it, and deadlocks while the Tk
+        # thread waits for the monitor the watcher is using
+        self._log_queue = []
+        self._log_lock = threading.Lock()
+        self.root.after(LOG_DRAIN_INTERVAL, self._drain_log)
+
     def log(self, message: str):
         """Thread-safe logging with timestamp."""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         full_message = f"[{timestamp}] {message}"
-        self.root.after(0, lambda: self._append_text(full_message))
 
-    def _append_text(self, message: str):
+        with self._log_lock:
+            self._log_queue.append(full_message)
+
+    def _drain_log(self):
+        self.root.after(LOG_DRAIN_INTERVAL, self._drain_log)
+        with self._log_lock:
+            messages = self._log_queue
+            self._log_queue = []
+        if not messages:
+            return
+
         self.text_area.config(state='normal')
+        for message in messages:
+            self.text_area.insert(tk.END, message + "\n", self._tag_for(message))
+        self.text_area.see(tk.END)
+        self.text_area.config(state='disabled')
 
+    @staticmethod
+    def _tag_for(message: str) -> str:
         # Color-code based on type
         if "[CREATED]" in message:
-            tag = "green"
+            return "green"
         elif "[DELETED]" in message:
-            tag = "red"
+            return "red"
         elif "[MODIFIED]" in message:
-            tag = "orange"
-        else:
-            tag = "black"
-
-        self.text_area.insert(tk.END, message + "\n", tag)
-        self.text_area.tag_config("green", foreground="green")
-        self.text_area.tag_config("red", foreground="red")
-        self.text_area.tag_config("orange", foreground="orange")
-        self.text_area.tag_config("black", foreground="black")
-
-        self.text_area.see(tk.END)
-        self.text_area.config(state='disabled')
+            return "orange"
+        return "black"
 
     def select_path(self):
         path = filedialog.askdirectory()
         if path:
-            self.monitor = FileMonitor(path, logger=self.log)
+            key = str(Path(path).resolve())
+            try:
+                self.monitor = self._monitor_cache.get(key) or FileMonitor(
+                    path, logger=self.log, paranoid=self.paranoid, algorithm=self.algorithm)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            self._monitor_cache[key] = self.monitor
             self.log(f"Monitoring path: {path}")
 
+            # Keep watching, but the newly selected path
+            if self.watcher:
+                self.watcher.stop()
+                self.watcher = Watcher(self.monitor)
+                self.watcher.start()
+
     def create_baseline(self):
         if not self.monitor:
             messagebox.showerror("Error", "Select a directory or file first")
@@ -73,22 +115,19 @@ class FileMonitorGUI:
         self.monitor.check_changes()
         self.log("Checked for changes")
 
-    def watch_loop(self):
-        while self.watching:
-            self.monitor.check_changes()
-            time.sleep(1)
-
     def start_watch(self):
         if not self.monitor:
             messagebox.showerror("Error", "Select a directory or file first")
             return
-        if not self.watching:
-            self.watching = True
-            threading.Thread(target=self.watch_loop, daemon=True).start()
+        if not self.watcher:
+            self.watcher = Watcher(self.monitor)
+            self.watcher.start()
             self.log("Started monitoring...")
 
     def stop_watch(self):
-        self.watching = False
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
         self.log("Stopped monitoring")
 
 
@@ -1,13 +1,17 @@
 import argparse
-import time
+from src._hash_backend import ALGORITHMS
 from src.file_monitor import FileMonitor
+from src.watcher import Watcher
 
-def run_cli():
+def run_cli(paranoid=False, algorithm=None):
     from src.file_monitor import FileMonitor
-    import time
 
     path = input("Enter directory or file to monitor: ").strip()
-    monitor = FileMonitor(path)
+    try:
+        monitor = FileMonitor(path, paranoid=paranoid, algorithm=algorithm)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return
 
     while True:
         print("\n--- File Integrity Monitor (CLI) ---")
@@ -26,11 +30,12 @@ def run_cli():
 
         elif choice == "3":
             print("Monitoring... Press Ctrl+C to stop")
+            watcher = Watcher(monitor)
+            watcher.start()
             try:
-                while True:
-                    monitor.check_changes()
-                    time.sleep(1)
+                watcher.join()
             except KeyboardInterrupt:
+                watcher.stop()
                 print("\nStopped monitoring.")
 
         elif choice == "4":
@@ -41,25 +46,29 @@ def run_cli():
             print("Invalid option. Try again.")
 
 
-def run_gui():
+def run_gui(paranoid=False, algorithm=None):
     """Run the file monitor in GUI mode."""
     import tkinter as tk
     from src.gui import FileMonitorGUI
 
     root = tk.Tk()
-    app = FileMonitorGUI(root)
+    app = FileMonitorGUI(root, paranoid=paranoid, algorithm=algorithm)
     root.mainloop()
 
 def main():
     parser = argparse.ArgumentParser(description="File Integrity Monitor")
     parser.add_argument("--cli", action="store_true", help="Run in CLI mode")
     parser.add_argument("--gui", action="store_true", help="Run in GUI mode")
+    parser.add_argument("--paranoid", action="store_true",
+                        help="Rehash every file on each check, even if size, mtime and inode are unchanged")
+    parser.add_argument("--algo", choices=ALGORITHMS, default=None,
+                        help="Hash algorithm (default: blake3 if installed, else sha256)")
     args = parser.parse_args()
 
     if args.gui:
-        run_gui()
+        run_gui(paranoid=args.paranoid, algorithm=args.algo)
     elif args.cli:
-        run_cli()
+        run_cli(paranoid=args.paranoid, algorithm=args.algo)
     else:
         print("Please specify --cli or --gui. Example:\n"
               "  python -m src.main --cli\n"
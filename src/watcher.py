@@ -0,0 +1,177 @@
+"""Event-driven watching for FileMonitor.
+
+Uses watchdog (inotify / FSEvents / ReadDirectoryChangesW) when it is
+installed, so only files the kernel reports as changed get rehashed. Falls
+back to polling check_changes() when watchdog is missing or the observer
+cannot be started (e.g. inotify watch limit reached, network filesystems).
+"""
+import queue
+import threading
+import time
+
+try:
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+# Seconds between full checks when polling
+POLL_INTERVAL = 1
+
+# Only these change kinds matter; opened/closed/access events are ignored
+WATCHED_EVENTS = {"created", "deleted", "modified", "moved"}
+
+# Seconds to keep collecting after the first event of a burst; an editor save
+# often fires several modify events within a few milliseconds
+COALESCE_WINDOW = 0.05
+
+# Queued in place of a path when the whole tree must be re-checked
+FULL_CHECK = None
+
+
+class _EventHandler:
+    """watchdog handler that queues the paths touched by each event."""
+
+    def __init__(self, events: queue.Queue):
+        self.events = events
+
+    def dispatch(self, event):
+        if event.event_type not in WATCHED_EVENTS:
+            return
+
+        # A directory move/delete affects every file below it
+        if event.is_directory:
+            if event.event_type != "modified":
+                self.events.put(FULL_CHECK)
+            return
+
+        self.events.put(event.src_path)
+        dest_path = getattr(event, "dest_path", "")
+        if dest_path:
+            self.events.put(dest_path)
+
+
+class EventSource:
+    """A watchdog observer that collects the paths changed under a monitor.
+
+    Events arrive from the observer thread shortly after each change, so a
+    drain() straight after a write may not include it yet; it is picked up
+    by the next drain.
+    """
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+        self.events = queue.Queue()
+        self._observer = None
+
+    @property
+    def running(self) -> bool:
+        return self._observer is not None
+
+    def start(self) -> bool:
+        """Start observing; False if event watching is unavailable here."""
+        if self._observer is not None:
+            return True
+        if Observer is None:
+            return False
+
+        try:
+            observer = Observer()
+            observer.schedule(
+                _EventHandler(self.events),
+                str(self.monitor.directory),
+                recursive=not self.monitor.single_file,
+            )
+            observer.start()
+        except Exception as e:
+            self.monitor.forensic_log.error(f"Event watching unavailable, polling instead: {e}")
+            return False
+
+        self._observer = observer
+        return True
+
+    def stop(self):
+        if self._observer:
+            self._observer.stop()
+            self._observer = None
+
+    def drain(self) -> set:
+        """Return the paths queued so far without waiting for more."""
+        paths = set()
+        while True:
+            try:
+                paths.add(self.events.get_nowait())
+            except queue.Empty:
+                return paths
+
+
+class Watcher:
+    """Runs FileMonitor checks in the background until stopped."""
+
+    def __init__(self, monitor, interval: float = POLL_INTERVAL):
+        self.monitor = monitor
+        self.interval = interval
+        self._stop_evt = threading.Event()
+        self._source = EventSource(monitor)
+        self._events = self._source.events
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._stop_evt.is_set()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop_evt.clear()
+
+        target = self._watch_events if self._source.start() else self._poll
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_evt.set()
+        self._source.stop()
+        # Wake the event loop so it notices the stop promptly
+        self._events.put(FULL_CHECK)
+
+    def join(self):
+        """Block until the watcher stops; stays interruptible by Ctrl+C."""
+        while self._thread and self._thread.is_alive():
+            self._thread.join(0.5)
+
+    def _poll(self):
+        # Waiting on the event instead of sleeping lets stop() end the loop
+        # immediately
+        while True:
+            self.monitor.check_changes()
+            if self._stop_evt.wait(self.interval):
+                break
+
+    def _coalesce(self, window: float = COALESCE_WINDOW) -> set:
+        """Block for the next event, then gather the rest of its burst."""
+        paths = {self._events.get()}
+        deadline = time.monotonic() + window
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                paths.add(self._events.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return paths
+
+    def _watch_events(self):
+        # Catch anything that changed before the observer was running
+        self.monitor.check_changes(full_rescan=True)
+
+        while not self._stop_evt.is_set():
+            paths = self._coalesce()
+
+            if self._stop_evt.is_set():
+                break
+            if FULL_CHECK in paths:
+                self.monitor.check_changes(full_rescan=True)
+            else:
+                self.monitor.rehash(paths)
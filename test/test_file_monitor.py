@@ -1,17 +1,33 @@
+import hashlib
 import unittest
+from unittest import mock
 import os
 import shutil
+import tempfile
 import time
 from pathlib import Path
-from src.file_monitor import FileMonitor
+from cryptography.fernet import Fernet
+from src import _hash_backend, watcher
+from src.file_monitor import FileMonitor, PARALLEL_THRESHOLD
 
 
 class TestFileMonitor(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        """One scratch root for the whole class, on tmpfs where available"""
+        shm = "/dev/shm"
+        cls.root_dir = tempfile.mkdtemp(prefix="fim_tests_",
+                                        dir=shm if os.path.isdir(shm) else None)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root_dir, ignore_errors=True)
+
     def setUp(self):
         """Set up test environment before each test"""
-        self.test_dir = "test_folder"
-        os.makedirs(self.test_dir, exist_ok=True)
+        # A fresh directory per test, so no test sees another's baseline
+        self.test_dir = tempfile.mkdtemp(dir=self.root_dir)
 
         # Create initial file
         with open(os.path.join(self.test_dir, "test.txt"), "w") as f:
@@ -22,20 +38,8 @@ class TestFileMonitor(unittest.TestCase):
         self.monitor.scan()  # create baseline
 
     def tearDown(self):
-        """Clean up test environment after each test - with retry for Windows lock"""
-        time.sleep(0.5)  # Give Windows time to release monitor.log handle
-
-        # Retry deletion up to 5 times (very reliable fix)
-        for _ in range(5):
-            try:
-                shutil.rmtree(self.test_dir)
-                return  # Success - stop retrying
-            except PermissionError:
-                time.sleep(0.2)  # Wait a bit more
-            except FileNotFoundError:
-                return  # Already gone
-
-        # Final fallback - ignore errors so test doesn't fail
+        """Clean up test environment after each test"""
+        self.monitor.close()
         shutil.rmtree(self.test_dir, ignore_errors=True)
 
     def test_hash_consistency(self):
@@ -44,6 +48,8 @@ class TestFileMonitor(unittest.TestCase):
         hash1 = self.monitor.calculate_hash(file_path)
         hash2 = self.monitor.calculate_hash(file_path)
         self.assertEqual(hash1, hash2)
+        self.assertEqual(len(hash1), 32)  # 256-bit digest for both algorithms
+        self.assertEqual(self.monitor.file_hashes_hex["test.txt"], hash1.hex())
 
     def test_file_creation(self):
         """Test detection of newly created file"""
@@ -76,6 +82,269 @@ class TestFileMonitor(unittest.TestCase):
         self.monitor.check_changes()
         self.assertTrue("test.txt" not in self.monitor.file_hashes)
 
+    def test_parallel_hashing_matches_inline(self):
+        """Test that the thread pool path produces the same hashes"""
+        for i in range(PARALLEL_THRESHOLD):
+            with open(os.path.join(self.test_dir, f"bulk_{i}.txt"), "w") as f:
+                f.write(f"content {i}")
+
+        self.monitor.scan()
+        self.assertEqual(len(self.monitor.file_hashes), PARALLEL_THRESHOLD + 1)
+        for name, filehash in self.monitor.file_hashes.items():
+            file_path = Path(os.path.join(self.test_dir, name))
+            self.assertEqual(filehash, self.monitor.calculate_hash(file_path))
+
+    def test_unchanged_stat_skips_rehash(self):
+        """Test that only paranoid mode rehashes a file with unchanged size and mtime"""
+        file_path = os.path.join(self.test_dir, "test.txt")
+        os.utime(file_path, ns=(0, 0))
+        self.monitor.scan()
+        old_hash = self.monitor.file_hashes["test.txt"]
+        # The walk records the real inode, as os.stat() does (also on Windows)
+        self.assertEqual(self.monitor.file_stats["test.txt"][2], os.stat(file_path).st_ino)
+
+        with open(file_path, "w") as f:
+            f.write("HELLO")
+        os.utime(file_path, ns=(0, 0))
+
+        self.monitor.check_changes()
+        self.assertEqual(self.monitor.file_hashes["test.txt"], old_hash)
+
+        self.monitor.paranoid = True
+        self.monitor.check_changes()
+        self.assertNotEqual(self.monitor.file_hashes["test.txt"], old_hash)
+
+    def test_baseline_round_trip(self):
+        """Test that a saved baseline loads back unchanged"""
+        reloaded = FileMonitor(self.test_dir)
+        self.assertEqual(reloaded.file_hashes, self.monitor.file_hashes)
+        self.assertEqual(reloaded.file_stats, self.monitor.file_stats)
+
+    def test_rehash_only_given_paths(self):
+        """Test that rehash picks up changes for the paths it is given"""
+        new_path = os.path.abspath(os.path.join(self.test_dir, "new.txt"))
+        with open(new_path, "w") as f:
+            f.write("new file")
+        os.remove(os.path.join(self.test_dir, "test.txt"))
+
+        self.monitor.rehash([new_path])
+        self.assertTrue("new.txt" in self.monitor.file_hashes)
+        self.assertTrue("test.txt" in self.monitor.file_hashes)
+
+    @unittest.skipUnless(watcher.Observer, "watchdog is not installed")
+    def test_watched_check_only_visits_events(self):
+        """Test that a watched check catches up once, then only follows events"""
+        with open(os.path.join(self.test_dir, "before.txt"), "w") as f:
+            f.write("made before the watch")
+        os.remove(os.path.join(self.test_dir, "test.txt"))
+
+        self.assertTrue(self.monitor.start_watch())
+        try:
+            # The first check walks, so changes made before the watch count
+            self.monitor.check_changes()
+            self.assertTrue("before.txt" in self.monitor.file_hashes)
+            self.assertTrue("test.txt" not in self.monitor.file_hashes)
+
+            new_path = os.path.join(self.test_dir, "new.txt")
+            with open(new_path, "w") as f:
+                f.write("new file")
+
+            # Events reach the queue from the observer thread
+            with mock.patch.object(self.monitor, "_iter_files",
+                                   side_effect=AssertionError("walked the tree")):
+                deadline = time.monotonic() + 5
+                while "new.txt" not in self.monitor.file_hashes and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    self.monitor.check_changes()
+            self.assertTrue("new.txt" in self.monitor.file_hashes)
+        finally:
+            self.monitor.stop_watch()
+
+    def test_monitors_share_new_key(self):
+        """Test that two monitors on a fresh directory encrypt with the same key"""
+        fresh_dir = os.path.join(self.test_dir, "fresh")
+        os.mkdir(fresh_dir)
+        file_path = os.path.join(fresh_dir, "a.txt")
+        with open(file_path, "w") as f:
+            f.write("hello")
+
+        dir_monitor = FileMonitor(fresh_dir)
+        file_monitor = FileMonitor(file_path)
+        dir_monitor.scan()
+        file_monitor.scan()
+
+        # Each monitor saves once more; both must use the key on disk
+        with open(file_path, "w") as f:
+            f.write("changed")
+        file_monitor.check_changes()
+        dir_monitor.check_changes()
+
+        messages = []
+        reloaded = FileMonitor(fresh_dir, logger=messages.append)
+        self.assertEqual(reloaded.file_hashes, dir_monitor.file_hashes)
+        self.assertFalse([m for m in messages if "[ERROR]" in m])
+
+    def test_legacy_key_kept_until_baseline_migrated(self):
+        """Test that a Fernet key is only replaced once its baseline is re-encrypted"""
+        legacy_dir = os.path.join(self.test_dir, "legacy")
+        os.mkdir(legacy_dir)
+        file_path = os.path.join(legacy_dir, "a.txt")
+        with open(file_path, "w") as f:
+            f.write("hello")
+        key_path = os.path.join(legacy_dir, ".key.key")
+        baseline_path = os.path.join(legacy_dir, ".baseline.txt")
+        legacy_key = Fernet.generate_key()
+        with open(key_path, "wb") as f:
+            f.write(legacy_key)
+
+        # A damaged baseline cannot be migrated, so the key must stay
+        with open(baseline_path, "wb") as f:
+            f.write(b"damaged")
+        FileMonitor(legacy_dir, logger=lambda message: None).close()
+        with open(key_path, "rb") as f:
+            self.assertEqual(f.read(), legacy_key)
+
+        digest = hashlib.sha256(b"hello").hexdigest()
+        with open(baseline_path, "wb") as f:
+            f.write(Fernet(legacy_key).encrypt(f"a.txt|{digest}\n".encode()))
+        monitor = FileMonitor(legacy_dir, algorithm="sha256")
+        monitor.close()
+        self.assertEqual(monitor.file_hashes["a.txt"].hex(), digest)
+        with open(key_path, "rb") as f:
+            self.assertEqual(len(f.read()), 32)
+        self.assertEqual(FileMonitor(legacy_dir, algorithm="sha256").file_hashes,
+                         monitor.file_hashes)
+
+    @unittest.skipUnless(watcher.Observer, "watchdog is not installed")
+    def test_watched_single_file_drains_events(self):
+        """Test that a watched single-file check does not leave events queued"""
+        file_path = os.path.join(self.test_dir, "test.txt")
+        monitor = FileMonitor(file_path)
+        self.assertTrue(monitor.start_watch())
+        try:
+            for i in range(10):
+                with open(os.path.join(self.test_dir, f"other{i}.txt"), "w") as f:
+                    f.write("sibling")
+            time.sleep(0.2)
+            monitor.check_changes()
+            self.assertEqual(monitor._event_source.events.qsize(), 0)
+        finally:
+            monitor.stop_watch()
+
+    @unittest.skipUnless(_hash_backend.blake3, "blake3 is not installed")
+    def test_interrupted_legacy_migration_keeps_label(self):
+        """Test that a re-encrypted legacy baseline keeps its SHA-256 label"""
+        legacy_dir = os.path.join(self.test_dir, "legacy")
+        os.mkdir(legacy_dir)
+        with open(os.path.join(legacy_dir, "a.txt"), "w") as f:
+            f.write("hello")
+        legacy_key = Fernet.generate_key()
+        with open(os.path.join(legacy_dir, ".key.key"), "wb") as f:
+            f.write(legacy_key)
+        digest = hashlib.sha256(b"hello").hexdigest()
+        with open(os.path.join(legacy_dir, ".baseline.txt"), "wb") as f:
+            f.write(Fernet(legacy_key).encrypt(f"a.txt|{digest}\n".encode()))
+
+        # Stop after the re-encrypt, before the switch to BLAKE3 is done
+        with mock.patch.object(FileMonitor, "_migrate_baseline", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                FileMonitor(legacy_dir, algorithm="blake3")
+
+        messages = []
+        monitor = FileMonitor(legacy_dir, logger=messages.append)
+        self.assertEqual(monitor.algorithm, "sha256")
+        monitor.check_changes()
+        self.assertFalse([m for m in messages if "[MODIFIED]" in m])
+
+    @unittest.skipUnless(_hash_backend.blake3, "blake3 is not installed")
+    def test_baseline_algorithm_migration(self):
+        """Test that a SHA-256 baseline is rehashed when switching to BLAKE3"""
+        sha_monitor = FileMonitor(self.test_dir, algorithm="sha256")
+        sha_monitor.scan()
+        sha_hash = sha_monitor.file_hashes["test.txt"]
+
+        blake_monitor = FileMonitor(self.test_dir, algorithm="blake3")
+        self.assertNotEqual(blake_monitor.file_hashes["test.txt"], sha_hash)
+        self.assertEqual(FileMonitor(self.test_dir, algorithm="blake3").file_hashes,
+                         blake_monitor.file_hashes)
+        # Without an explicit choice the baseline's algorithm is kept
+        self.assertEqual(FileMonitor(self.test_dir).algorithm, "blake3")
+
+    @unittest.skipUnless(_hash_backend.blake3, "blake3 is not installed")
+    def test_unverifiable_baseline_not_migrated(self):
+        """Test that a baseline is not migrated when its algorithm is unavailable"""
+        blake_monitor = FileMonitor(self.test_dir, algorithm="blake3")
+        blake_monitor.scan()
+        with open(blake_monitor.baseline_file, "rb") as f:
+            baseline = f.read()
+
+        with mock.patch.object(_hash_backend, "blake3", None):
+            with self.assertRaises(ValueError):
+                FileMonitor(self.test_dir, algorithm="sha256", logger=lambda message: None)
+            with self.assertRaises(ValueError):
+                FileMonitor(self.test_dir, logger=lambda message: None)
+        with open(blake_monitor.baseline_file, "rb") as f:
+            self.assertEqual(f.read(), baseline)
+
+    def test_single_file_monitoring(self):
+        """Test that monitoring a single file detects its modification"""
+        file_path = os.path.join(self.test_dir, "test.txt")
+        monitor = FileMonitor(file_path)
+        monitor.scan()
+        old_hash = monitor.file_hashes["test.txt"]
+
+        with open(file_path, "w") as f:
+            f.write("modified content")
+
+        monitor.check_changes()
+        self.assertEqual(list(monitor.file_hashes), ["test.txt"])
+        self.assertNotEqual(monitor.file_hashes["test.txt"], old_hash)
+
+    def test_paranoid_single_file_rereads(self):
+        """Test that paranoid checks of a single file always re-read it"""
+        file_path = os.path.join(self.test_dir, "test.txt")
+        os.utime(file_path, (1, 1))
+        monitor = FileMonitor(file_path, paranoid=True)
+        monitor.scan()
+
+        with mock.patch("src.file_monitor.hash_file", wraps=_hash_backend.hash_file) as hash_file:
+            for _ in range(3):
+                monitor.check_changes()
+        self.assertEqual(hash_file.call_count, 3)
+
+    def test_failed_hash_is_stable(self):
+        """Test that a file that cannot be hashed is not reported as modified"""
+        def failing_hash_files(paths, algorithm):
+            return ((path, OSError("unreadable")) for path in paths)
+
+        messages = []
+        with mock.patch("src.file_monitor.hash_files", failing_hash_files):
+            self.monitor.scan()
+            self.assertEqual(self.monitor.file_hashes["test.txt"], b"")
+            self.assertEqual(self.monitor.file_hashes_hex["test.txt"], "")
+
+            reloaded = FileMonitor(self.test_dir, logger=messages.append)
+            reloaded.check_changes()
+        self.assertFalse([m for m in messages if "[MODIFIED]" in m])
+
+    def test_replaced_file_is_rehashed(self):
+        """Test that a file swapped in by rename is rehashed despite equal size and mtime"""
+        file_path = os.path.join(self.test_dir, "test.txt")
+        os.utime(file_path, ns=(0, 0))
+        self.monitor.scan()
+        old_hash = self.monitor.file_hashes["test.txt"]
+        # The walk records the real inode, as os.stat() does (also on Windows)
+        self.assertEqual(self.monitor.file_stats["test.txt"][2], os.stat(file_path).st_ino)
+
+        replacement = os.path.join(self.test_dir, "replacement.tmp")
+        with open(replacement, "w") as f:
+            f.write("HELLO")
+        os.utime(replacement, ns=(0, 0))
+        os.replace(replacement, file_path)
+
+        self.monitor.check_changes()
+        self.assertNotEqual(self.monitor.file_hashes["test.txt"], old_hash)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
\ No newline at end of file